@@ -2,30 +2,40 @@ import sys
 import os
 import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
+from scipy.sparse import csr_matrix, issparse
 
-def parse_input(lines):
+def parse_input(source, batch=False):
+    # source is an open file or the JSON text itself. In batch mode the
+    # input may also be just the LP object; the solutions come from files.
     try:
-        parsed = json.loads("".join(lines))
+        parsed = json.loads(source) if isinstance(source, str) else json.load(source)
+        if batch and isinstance(parsed, dict):
+            return parsed, None
         if not isinstance(parsed, list) or len(parsed) != 2:
             raise ValueError("Input must be a JSON array of two objects.")
         lp_data, solution_data = parsed
+        if batch:
+            return lp_data, None
         return lp_data, solution_data["variable_values"]
     except Exception as e:
         print(f"Error parsing input: {e}", file=sys.stderr)
         sys.exit(1)
 
-def format_constraint_row(row, var_names, relation, rhs, lhs_val):
-    terms = []
-    for coeff, name in zip(row, var_names):
-        if abs(coeff) > 1e-8:
-            sign = "+" if coeff > 0 else "-"
-            mag = abs(coeff)
-            if mag == 1:
-                terms.append(f"{sign} {name}")
-            else:
-                terms.append(f"{sign} {mag:g}{name}")
-    expr = " ".join(terms).lstrip("+ ").replace("+ -", "- ")
+def format_term(coeff, name):
+    sign = "+" if coeff > 0 else "-"
+    mag = abs(coeff)
+    return f"{sign} {name}" if mag == 1 else f"{sign} {mag:g}{name}"
+
+def format_constraint_row(cols, coeffs, var_names, relation, rhs, lhs_val):
+    # cols/coeffs are the row's nonzeros in column order (see row_nonzeros)
+    terms = [format_term(coeff, var_names[i]) for i, coeff in zip(cols, coeffs)]
+    # A leading positive term is written without its sign
+    if terms and terms[0].startswith("+ "):
+        terms[0] = terms[0][2:]
+    expr = " ".join(terms)
     return {
         "expression": f"{expr} {relation} {float(rhs):g}",
         "lhs": float(lhs_val),
@@ -33,43 +43,75 @@ def format_constraint_row(row, var_names, relation, rhs, lhs_val):
         "violation": f"{float(lhs_val):.6g} {relation} {float(rhs):.6g} is False"
     }
 
+def load_matrix(lp, name):
+    # Sparse inputs ("<name>_coo" triplets) become CSR so the residuals are
+    # an O(nnz) matvec; dense lists stay dense. None if there are no rows.
+    coo = lp.get(f"{name}_coo")
+    if coo is not None:
+        A = csr_matrix(
+            (np.asarray(coo["val"], dtype=np.float64), (coo["row"], coo["col"])),
+            shape=tuple(coo["shape"])
+        )
+        A.sum_duplicates()  # also sorts each row's column indices
+        return A if A.shape[0] > 0 else None
+    A = lp.get(name)
+    if issparse(A):
+        return A if A.shape[0] > 0 else None
+    A = np.asarray(A if A is not None else [], dtype=np.float64)
+    return A if A.size > 0 else None
+
+def row_nonzeros(A, i):
+    # Column indices and coefficients of row i's nonzeros; a CSR row is read
+    # straight from its slice, so no dense row is ever built
+    if issparse(A):
+        start, end = A.indptr[i], A.indptr[i + 1]
+        cols, coeffs = A.indices[start:end], A.data[start:end]
+    else:
+        cols = np.flatnonzero(A[i])
+        coeffs = A[i, cols]
+    keep = np.abs(coeffs) > 1e-8
+    return cols[keep], coeffs[keep]
+
 def check_feasibility(lp, values):
     var_names = lp.get("variable_names")
-    x = np.array([values[name] for name in var_names])
+    x = np.fromiter((values[name] for name in var_names), dtype=np.float64, count=len(var_names))
 
     results = {
         "all_constraints_satisfied": True,
         "violations": []
     }
 
-    A_ub = np.array(lp.get("A_ub", []))
-    b_ub = np.array(lp.get("b_ub", []))
-    if len(A_ub) > 0:
-        lhs = A_ub @ x
-        for i, (row, lhs_val, rhs_val) in enumerate(zip(A_ub, lhs, b_ub)):
-            if lhs_val > rhs_val + 1e-8:
-                results["all_constraints_satisfied"] = False
-                results["violations"].append({
-                    "type": "inequality",
-                    "index": int(i),
-                    **format_constraint_row(row, var_names, "<=", rhs_val, lhs_val)
-                })
-
-    A_eq = np.array(lp.get("A_eq", []))
-    b_eq = np.array(lp.get("b_eq", []))
-    if len(A_eq) > 0:
-        lhs = A_eq @ x
-        for i, (row, lhs_val, rhs_val) in enumerate(zip(A_eq, lhs, b_eq)):
-            if abs(lhs_val - rhs_val) > 1e-8:
-                results["all_constraints_satisfied"] = False
-                results["violations"].append({
-                    "type": "equality",
-                    "index": int(i),
-                    **format_constraint_row(row, var_names, "=", rhs_val, lhs_val)
-                })
+    A_ub = load_matrix(lp, "A_ub")
+    if A_ub is not None:
+        b_ub = np.asarray(lp["b_ub"], dtype=np.float64)
+        lhs = A_ub.dot(x)
+        for i in np.flatnonzero(lhs > b_ub + 1e-8):
+            results["all_constraints_satisfied"] = False
+            results["violations"].append({
+                "type": "inequality",
+                "index": int(i),
+                **format_constraint_row(*row_nonzeros(A_ub, i), var_names, "<=", b_ub[i], lhs[i])
+            })
+
+    A_eq = load_matrix(lp, "A_eq")
+    if A_eq is not None:
+        b_eq = np.asarray(lp["b_eq"], dtype=np.float64)
+        lhs = A_eq.dot(x)
+        for i in np.flatnonzero(np.abs(lhs - b_eq) > 1e-8):
+            results["all_constraints_satisfied"] = False
+            results["violations"].append({
+                "type": "equality",
+                "index": int(i),
+                **format_constraint_row(*row_nonzeros(A_eq, i), var_names, "=", b_eq[i], lhs[i])
+            })
 
     bounds = lp.get("bounds", [])
-    for i, (lower, upper) in enumerate(bounds):
+    # Missing bounds become infinite so every variable is tested in one pass
+    lo = np.array([-np.inf if lower is None else lower for lower, _ in bounds], dtype=np.float64)
+    hi = np.array([np.inf if upper is None else upper for _, upper in bounds], dtype=np.float64)
+    xb = x[:len(bounds)]
+    for i in np.flatnonzero((xb < lo - 1e-8) | (xb > hi + 1e-8)):
+        lower, upper = bounds[i]
         val = x[i]
         if lower is not None and val < lower - 1e-8:
             results["all_constraints_satisfied"] = False
@@ -90,28 +132,117 @@ def check_feasibility(lp, values):
 
     return results
 
+# Batch mode: the LP's constraint matrices are copied into shared memory
+# once, and every worker process maps them instead of unpickling its own copy
+
+_batch_lp = None
+_batch_blocks = []
+
+def share_array(arr, blocks):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    blocks.append(shm)
+    return shm.name, arr.shape, arr.dtype.str
+
+def attach_array(spec, blocks):
+    name, shape, dtype = spec
+    # Workers share the parent's resource tracker, so attaching does not
+    # add a second owner; the parent unlinks the block when the batch ends
+    shm = shared_memory.SharedMemory(name=name)
+    blocks.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def share_matrix(A, blocks):
+    if A is None:
+        return None
+    if issparse(A):
+        A = A.tocsr()
+        return "csr", A.shape, [share_array(a, blocks) for a in (A.data, A.indices, A.indptr)]
+    return "dense", A.shape, [share_array(A, blocks)]
+
+def attach_matrix(spec, blocks):
+    if spec is None:
+        return None
+    kind, shape, arrays = spec
+    arrays = [attach_array(a, blocks) for a in arrays]
+    if kind == "csr":
+        return csr_matrix(tuple(arrays), shape=shape, copy=False)
+    return arrays[0]
+
+def init_batch_worker(lp_rest, matrix_specs):
+    global _batch_lp
+    _batch_lp = dict(lp_rest)
+    for name, spec in matrix_specs.items():
+        _batch_lp[name] = attach_matrix(spec, _batch_blocks)
+
+def check_solution_file(path):
+    try:
+        with open(path) as f:
+            values = json.load(f).get("variable_values")
+        if values is None:
+            raise ValueError("no variable values (was the LP solved?)")
+    except Exception as e:
+        return {"error": f"Error reading solution: {e}"}
+    # A bad solution (e.g. missing one of the LP's variables) must not
+    # abort the whole batch
+    try:
+        return check_feasibility(_batch_lp, values)
+    except Exception as e:
+        return {"error": f"Error checking solution: {type(e).__name__}: {e}"}
+
+def check_batch(lp, solution_paths):
+    matrix_names = ("A_ub", "A_eq")
+    lp_rest = {k: v for k, v in lp.items()
+               if k not in matrix_names and k not in ("A_ub_coo", "A_eq_coo")}
+    blocks = []
+    try:
+        matrix_specs = {name: share_matrix(load_matrix(lp, name), blocks) for name in matrix_names}
+        workers = max(1, min(os.cpu_count() or 1, len(solution_paths)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker,
+                                 initargs=(lp_rest, matrix_specs)) as ex:
+            results = list(ex.map(check_solution_file, solution_paths))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return {os.path.basename(path): result for path, result in zip(solution_paths, results)}
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("input_file", nargs="?")
     parser.add_argument("output_file", nargs="?")
     parser.add_argument("-d", dest="directory", default=".")
+    parser.add_argument("--batch", dest="solution_dir",
+                        help="Check every .json solution in this directory against the input LP")
     args = parser.parse_args()
 
     input_path = os.path.join(args.directory, args.input_file) if args.input_file else None
     output_path = os.path.join(args.directory, args.output_file) if args.output_file else None
 
+    batch = args.solution_dir is not None
     try:
         if input_path:
             with open(input_path) as f:
-                lines = f.readlines()
+                lp_data, var_values = parse_input(f, batch)
         else:
-            lines = sys.stdin.readlines()
+            lp_data, var_values = parse_input(sys.stdin, batch)
     except Exception as e:
         print(f"Error reading input: {e}", file=sys.stderr)
         sys.exit(1)
 
-    lp_data, var_values = parse_input(lines)
-    result = check_feasibility(lp_data, var_values)
+    if batch:
+        solution_dir = os.path.join(args.directory, args.solution_dir)
+        try:
+            solution_paths = sorted(
+                os.path.join(solution_dir, name) for name in os.listdir(solution_dir)
+                if name.endswith(".json")
+            )
+        except Exception as e:
+            print(f"Error reading solution directory: {e}", file=sys.stderr)
+            sys.exit(1)
+        result = check_batch(lp_data, solution_paths)
+    else:
+        result = check_feasibility(lp_data, var_values)
 
     try:
         if output_path:
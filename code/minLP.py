@@ -3,7 +3,13 @@ import json
 import os
 import argparse
 import numpy as np
-from scipy.optimize import linprog
+from scipy.optimize import OptimizeResult, linprog
+from scipy.sparse import coo_matrix, csr_matrix, issparse
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
 
 def load_input_data(filepath):
     try:
@@ -22,17 +28,173 @@ def write_output_data(filepath, data):
         print(f"Error writing output file: {e}", file=sys.stderr)
         sys.exit(1)
 
+def to_sparse(A):
+    # HiGHS accepts sparse constraint matrices natively; avoid handing it
+    # a dense list-of-lists that is almost entirely zeros
+    if A is None or issparse(A):
+        return A
+    if len(A) == 0:
+        return None
+    return csr_matrix(A)
+
+def load_matrix(lp_data, name):
+    # Sparse inputs store the matrix as COO triplets under "<name>_coo"
+    coo = lp_data.get(f"{name}_coo")
+    if coo is not None:
+        return coo_matrix(
+            (coo["val"], (coo["row"], coo["col"])),
+            shape=tuple(coo["shape"])
+        ).tocsr()
+    return to_sparse(lp_data.get(name))
+
+def to_float_array(values):
+    # Pass float64 arrays so the HiGHS wrapper doesn't convert element by element
+    return np.asarray(values, dtype=np.float64) if values else None
+
+def _solve_with_linprog(lp_data):
+    return linprog(
+        c=to_float_array(lp_data["c"]),
+        A_ub=load_matrix(lp_data, "A_ub"),
+        b_ub=to_float_array(lp_data.get("b_ub")),
+        A_eq=load_matrix(lp_data, "A_eq"),
+        b_eq=to_float_array(lp_data.get("b_eq")),
+        bounds=lp_data.get("bounds"),
+        method="highs",
+        options={"presolve": True}
+    )
+
+def load_triplets(lp_data, name):
+    # COO (row, col, value) arrays for the matrix, or None if it is empty
+    A = load_matrix(lp_data, name)
+    if A is None:
+        return None
+    A = A.tocoo()
+    return A.row, A.col, A.data.astype(np.float64, copy=False), A.shape
+
+def column_bounds(bounds, n):
+    # Same forms as linprog: None (x >= 0), one (lower, upper) pair for
+    # every column, or one pair per column; None or NaN means unbounded
+    if bounds is None or len(bounds) == 0:
+        bounds = [[0, None]]
+    elif len(bounds) == 2 and all(b is None or np.isscalar(b) for b in bounds):
+        bounds = [bounds]
+    if len(bounds) == 1:
+        bounds = bounds * n
+    if len(bounds) != n:
+        raise ValueError(f"Invalid input: bounds has {len(bounds)} entries for {n} variables")
+    lower = np.array([np.nan if lo is None else lo for lo, _ in bounds], dtype=np.float64)
+    upper = np.array([np.nan if hi is None else hi for _, hi in bounds], dtype=np.float64)
+    # linprog reads NaN the same as None
+    lower[np.isnan(lower)] = -np.inf
+    upper[np.isnan(upper)] = np.inf
+    return lower, upper
+
+def coo_to_csc_arrays(rows, cols, vals, num_col):
+    # HiGHS stores the matrix column-wise, so group the triplets by column
+    # with one stable sort rather than have it transpose a row-wise matrix.
+    # Rows stay in their input order within each column.
+    order = np.argsort(cols, kind="stable")
+    start = np.zeros(num_col + 1, dtype=np.int32)
+    np.cumsum(np.bincount(cols, minlength=num_col), out=start[1:])
+    return start, rows[order].astype(np.int32, copy=False), vals[order]
+
+def _solve_with_highspy(lp_data):
+    # Hand HiGHS the CSC arrays directly instead of going through linprog's
+    # validation and copies. Rows are A_ub (-inf <= A_ub x <= b_ub)
+    # followed by A_eq (b_eq <= A_eq x <= b_eq).
+    inf = highspy.kHighsInf
+    c = np.asarray(lp_data["c"], dtype=np.float64)
+    n = len(c)
+    # HiGHS loads what it can of an inconsistent model and solves that, so
+    # make the checks linprog would make before handing anything over
+    if c.ndim != 1 or not np.all(np.isfinite(c)):
+        raise ValueError("Invalid input: c must be a 1-D array of finite numbers")
+    rows, cols, vals = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.int32)], [np.empty(0)]
+    row_lower, row_upper = [np.empty(0)], [np.empty(0)]
+    m = 0
+    for name, b_name in (("A_ub", "b_ub"), ("A_eq", "b_eq")):
+        triplets = load_triplets(lp_data, name)
+        if triplets is None:
+            continue
+        r, col, v, (num_row, num_col) = triplets
+        b = np.asarray(lp_data.get(b_name) or [], dtype=np.float64)
+        if num_col != n:
+            raise ValueError(f"Invalid input: {name} has {num_col} columns for {n} variables")
+        if b.shape != (num_row,) or not np.all(np.isfinite(b)):
+            raise ValueError(f"Invalid input: {b_name} must have one finite number per row of {name} ({num_row})")
+        if not np.all(np.isfinite(v)):
+            raise ValueError(f"Invalid input: {name} must not contain NaN or infinite values")
+        rows.append(r + m)
+        cols.append(col)
+        vals.append(v)
+        row_lower.append(np.full(num_row, -inf) if name == "A_ub" else b)
+        row_upper.append(b)
+        m += num_row
+    start, index, value = coo_to_csc_arrays(
+        np.concatenate(rows), np.concatenate(cols), np.concatenate(vals), n
+    )
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = n
+    lp.num_row_ = m
+    lp.col_cost_ = c
+    lp.col_lower_, lp.col_upper_ = column_bounds(lp_data.get("bounds"), n)
+    lp.row_lower_ = np.concatenate(row_lower)
+    lp.row_upper_ = np.concatenate(row_upper)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = start
+    lp.a_matrix_.index_ = index
+    lp.a_matrix_.value_ = value
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.setOptionValue("presolve", "on")
+    h.setOptionValue("parallel", "on")
+    h.setOptionValue("threads", os.cpu_count() or 1)
+    if h.passModel(lp) != highspy.HighsStatus.kOk:
+        raise ValueError("HiGHS rejected the model")
+    if h.run() != highspy.HighsStatus.kOk:
+        raise RuntimeError("HiGHS failed to solve the model")
+
+    # Report the same status codes and messages as linprog
+    model_status = h.getModelStatus()
+    status, message = _HIGHS_STATUS.get(
+        model_status, (4, "The HiGHS status code was not recognized. ")
+    )
+    success = model_status == highspy.HighsModelStatus.kOptimal
+    if success:
+        detail = h.modelStatusToString(model_status)
+    else:
+        detail = (f"model_status is {h.modelStatusToString(model_status)}; "
+                  f"primal_status is {h.solutionStatusToString(h.getInfo().primal_solution_status)}")
+    return OptimizeResult(
+        success=success,
+        status=status,
+        message=f"{message}(HiGHS Status {int(model_status)}: {detail})",
+        fun=h.getInfo().objective_function_value if success else None,
+        x=np.array(h.getSolution().col_value) if success else None
+    )
+
+if highspy is not None:
+    _HIGHS_STATUS = {
+        highspy.HighsModelStatus.kModelError: (2, ""),
+        highspy.HighsModelStatus.kOptimal: (0, "Optimization terminated successfully. "),
+        highspy.HighsModelStatus.kTimeLimit: (1, "Time limit reached. "),
+        highspy.HighsModelStatus.kIterationLimit: (1, "Iteration limit reached. "),
+        highspy.HighsModelStatus.kInfeasible: (2, "The problem is infeasible. "),
+        highspy.HighsModelStatus.kUnbounded: (3, "The problem is unbounded. "),
+        highspy.HighsModelStatus.kUnboundedOrInfeasible: (4, "The problem is unbounded or infeasible. "),
+    }
+    # Every other known status is reported with an empty message
+    for _status in highspy.HighsModelStatus.__members__.values():
+        _HIGHS_STATUS.setdefault(_status, (4, ""))
+
 def solve_lp(lp_data):
     try:
-        result = linprog(
-        c=lp_data["c"],
-        A_ub=lp_data.get("A_ub") or None,
-        b_ub=lp_data.get("b_ub") or None,
-        A_eq=lp_data.get("A_eq") or None,
-        b_eq=lp_data.get("b_eq") or None,
-        bounds=lp_data.get("bounds"),
-        method="highs"
-)
+        if highspy is not None:
+            result = _solve_with_highspy(lp_data)
+        else:
+            result = _solve_with_linprog(lp_data)
         return {
             "success": result.success,
             "status": result.status,
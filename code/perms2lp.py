@@ -3,177 +3,219 @@ import os
 import argparse
 import json
 import re
-from scipy.optimize import linprog
+import warnings
+import numpy as np
+from scipy.sparse import coo_matrix
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def to_json(obj):
+    # orjson encodes straight to bytes in C; fall back to the stdlib encoder
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2)
+
+def read_input_lines(f):
+    # Only the first three lines are used; stop at EOF so a short file
+    # still fails in parse_input
+    lines = (f.readline() for _ in range(3))
+    return [line for line in lines if line]
+
+def parse_permutation(line):
+    # np.fromstring parses the integers in C; it only warns about trailing
+    # text it could not read, so make that an error. Parse as int64 so
+    # values past int32 cannot wrap into range before they are checked.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        return np.fromstring(line, dtype=np.int64, sep=' ')
 
 def parse_input(lines):
     try:
-        P1 = list(map(int, lines[0].strip().split()))
-        P2 = list(map(int, lines[1].strip().split()))
+        P1 = parse_permutation(lines[0])
+        P2 = parse_permutation(lines[1])
         obj_expr = lines[2].strip()
-        return P1, P2, obj_expr
+        n = len(P1)
+        if n == 0 or len(P2) != n:
+            raise ValueError("P1 and P2 must be non-empty and of the same length")
+        identity = np.arange(1, n + 1)
+        for name, P in (("P1", P1), ("P2", P2)):
+            if not np.array_equal(np.sort(P), identity):
+                raise ValueError(f"{name} is not a permutation of 1..{n}")
+        return P1.astype(np.int32), P2.astype(np.int32), obj_expr
     except Exception as e:
         print(f"Error parsing input: {e}", file=sys.stderr)
         sys.exit(1)
 
+# Matches terms like '3 x_1', '- x_2', 'y_4', etc.
+_OBJ_RE = re.compile(r'(?P<sign>[+-])?\s*(?P<num>\d*)\s*(?P<var>[xy])_(?P<idx>\d+)')
+
 def parse_objective(expr, n):
     # Initialize zero coefficients for 2n variables
-    coeffs = [0] * (2 * n)
-    # Matches terms like '3 x_1', '- x_2', 'y_4', etc.
-    tokens = re.findall(r'[+-]?\s*\d*\s*[xy]_\d+', expr)
-    for token in tokens:
-        token = token.replace(' ', '')
-        match = re.match(r'([+-]?)(\d*)([xy])_(\d+)', token)
-        if match:
-            sign, num, var, idx = match.groups()
-            idx = int(idx) - 1
-            if idx < 0 or idx >= n:
-                print(f"Invalid variable index in objective: {token}", file=sys.stderr)
-                sys.exit(1)
-            coeff = int(num) if num else 1
-            if sign == '-':
-                coeff = -coeff
-            if var == 'x':
-                coeffs[idx] = coeff
-            else:
-                coeffs[n + idx] = coeff
+    coeffs = np.zeros(2 * n, dtype=np.int64)
+    for match in _OBJ_RE.finditer(expr):
+        idx = int(match['idx']) - 1
+        if idx < 0 or idx >= n:
+            print(f"Invalid variable index in objective: {match[0]}", file=sys.stderr)
+            sys.exit(1)
+        coeff = int(match['num']) if match['num'] else 1
+        if match['sign'] == '-':
+            coeff = -coeff
+        coeffs[(n if match['var'] == 'y' else 0) + idx] += coeff
     return coeffs
 
-def build_full_constraints(P1, P2, n):
-    from itertools import chain
-    A_ub, b_ub = [], []
+def load_numba_kernels():
+    # Opt-in and imported lazily: importing numba and loading even the cached
+    # kernels costs about half a second per process, more than the vectorized
+    # NumPy generators take at n = 1e6. None if numba is not installed.
+    try:
+        import perms2lp_numba
+    except ImportError:
+        return None
+    return (perms2lp_numba.monotonicity_nb,
+            perms2lp_numba.spacing_nb,
+            perms2lp_numba.combined_nb)
+
+def build_full_constraints(P1, P2, n, use_numba=False):
+    # P1 and P2 are int32 arrays, as returned by parse_input
+    # 1-based inverse permutations shared by all generators:
+    # Q1[i] = position of i+1 in P1
+    positions = np.arange(1, n + 1, dtype=np.int32)
+    Q1 = np.zeros(n, dtype=np.int32)
+    Q2 = np.zeros(n, dtype=np.int32)
+    Q1[P1 - 1] = positions
+    Q2[P2 - 1] = positions
+
+    rows, cols, vals, b_ub = [], [], [], []
+    m = 0
 
-    # Helpers from earlier constraint groups
+    # Each generator returns COO triplets with row indices local to its block
     def add_constraints(generator):
-        A, b = generator(P1, P2, n)
-        A_ub.extend(A)
-        b_ub.extend(b)
-
-    add_constraints(generate_monotonicity_constraints)
-    add_constraints(generate_spacing_constraints)
-    add_constraints(generate_combined_constraints)
-
-    return A_ub, b_ub
-
-def generate_monotonicity_constraints(P1, P2, n):
-    A_ub, b_ub = [], []
-    row = [0] * (2 * n)
-    row[P1[0] - 1] = -1
-    A_ub.append(row[:])
-    b_ub.append(-1)
-    row = [0] * (2 * n)
-    row[n + P2[0] - 1] = -1
-    A_ub.append(row[:])
-    b_ub.append(-1)
-    for i in range(n - 1):
-        row = [0] * (2 * n)
-        row[P1[i] - 1] = 1
-        row[P1[i + 1] - 1] = -1
-        A_ub.append(row)
-        b_ub.append(0)
-    for i in range(n - 1):
-        row = [0] * (2 * n)
-        row[n + P2[i] - 1] = 1
-        row[n + P2[i + 1] - 1] = -1
-        A_ub.append(row)
-        b_ub.append(0)
-    return A_ub, b_ub
-
-def generate_spacing_constraints(P1, P2, n):
-    A_ub, b_ub = [], []
-
-    # 1-based inverse permutations: Q1[i] = position of i+1 in P1
-    Q1 = [0] * n
-    Q2 = [0] * n
-    for i in range(n):
-        Q1[P1[i] - 1] = i + 1
-        Q2[P2[i] - 1] = i + 1
-
-    # Constraints based on Q2 and P1 → x variables
-    for i in range(1, n - 1):  # i from 1 to n-2 → i+1 is in [2, n-1]
-        a = Q2[P1[i - 1] - 1]
-        b = Q2[P1[i] - 1]
-        c = Q2[P1[i + 1] - 1]
-        if (a - b) * (c - b) > 0:
-            row = [0] * (2 * n)
-            row[P1[i - 1] - 1] = 1
-            row[P1[i + 1] - 1] = -1
-            A_ub.append(row)
-            b_ub.append(-1)
-
-    # Constraints based on Q1 and P2 → y variables
-    for i in range(1, n - 1):
-        a = Q1[P2[i - 1] - 1]
-        b = Q1[P2[i] - 1]
-        c = Q1[P2[i + 1] - 1]
-        if (a - b) * (c - b) > 0:
-            row = [0] * (2 * n)
-            row[n + P2[i - 1] - 1] = 1
-            row[n + P2[i + 1] - 1] = -1
-            A_ub.append(row)
-            b_ub.append(-1)
-
-    return A_ub, b_ub
-
-def generate_combined_constraints(P1, P2, n):
-    A_ub, b_ub = [], []
-
-    # Build 1-based inverse permutations
-    Q1 = [0] * n
-    Q2 = [0] * n
-    for i in range(n):
-        Q1[P1[i] - 1] = i + 1
-        Q2[P2[i] - 1] = i + 1
-
-    # Constraints from P1 and Q2
-    for i in range(n - 1):
-        u = P1[i + 1]
-        v = P1[i]
-        q_u = Q2[u - 1]
-        q_v = Q2[v - 1]
-
-        row = [0] * (2 * n)
-        row[u - 1] = -1     # -x_u
-        row[v - 1] = 1      # +x_v
-
-        if q_v < q_u:
-            row[n + u - 1] = -1     # -y_u
-            row[n + v - 1] = 1      # +y_v
-        else:
-            row[n + v - 1] = -1     # -y_v
-            row[n + u - 1] = 1      # +y_u
-
-        A_ub.append(row)
-        b_ub.append(-1)
-
-    # Constraints from P2 and Q1
-    for i in range(n - 1):
-        u = P2[i + 1]
-        v = P2[i]
-        q_u = Q1[u - 1]
-        q_v = Q1[v - 1]
-
-        row = [0] * (2 * n)
-        row[n + u - 1] = -1     # -y_u
-        row[n + v - 1] = 1      # +y_v
-
-        if q_v < q_u:
-            row[u - 1] = -1     # -x_u
-            row[v - 1] = 1      # +x_v
-        else:
-            row[v - 1] = -1     # -x_v
-            row[u - 1] = 1      # +x_u
+        nonlocal m
+        r, c, v, b = generator(P1, P2, Q1, Q2, n)
+        rows.append(r + m)
+        cols.append(c)
+        vals.append(v)
+        b_ub.append(b)
+        m += len(b)
+
+    kernels = load_numba_kernels() if use_numba else None
+    if kernels is not None:
+        generators = kernels
+    else:
+        generators = (generate_monotonicity_constraints,
+                      generate_spacing_constraints,
+                      generate_combined_constraints)
+    for generator in generators:
+        add_constraints(generator)
+
+    # Coefficients are in {-1, 0, 1} and bounds in {-1, 0}, so both stay
+    # int8; the solver casts them to double only when the model is passed in
+    A_ub = coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(m, 2 * n)
+    ).tocsr()
+    return A_ub, np.concatenate(b_ub)
+
+def generate_monotonicity_constraints(P1, P2, Q1, Q2, n):
+    k = n - 1
+    nnz = 2 + 4 * k
+    rows = np.empty(nnz, dtype=np.int32)
+    cols = np.empty(nnz, dtype=np.int32)
+    vals = np.empty(nnz, dtype=np.int8)
+    b_ub = np.zeros(2 + 2 * k, dtype=np.int8)
+
+    # -x_{P1[0]} <= -1 and -y_{P2[0]} <= -1
+    rows[:2] = (0, 1)
+    cols[:2] = (P1[0] - 1, n + P2[0] - 1)
+    vals[:2] = -1
+    b_ub[:2] = -1
+
+    # x_{P1[i]} - x_{P1[i+1]} <= 0, then the same chain for y along P2
+    x_rows = np.arange(2, 2 + k, dtype=np.int32)
+    y_rows = x_rows + k
+    blocks = (
+        (x_rows, P1[:-1] - 1, 1),
+        (x_rows, P1[1:] - 1, -1),
+        (y_rows, n + P2[:-1] - 1, 1),
+        (y_rows, n + P2[1:] - 1, -1),
+    )
+    pos = 2
+    for r, c, v in blocks:
+        rows[pos:pos + k] = r
+        cols[pos:pos + k] = c
+        vals[pos:pos + k] = v
+        pos += k
+    return rows, cols, vals, b_ub
+
+def generate_spacing_constraints(P1, P2, Q1, Q2, n):
+    def local_extrema(P, Q, offset):
+        # Interior positions i (1..n-2) where Q[P[i]] is a strict local
+        # min or max of its neighbours give P[i-1] - P[i+1] <= -1
+        mapped = Q[P - 1].astype(np.int64)  # products can overflow int32
+        mid = mapped[1:-1]
+        idx = np.flatnonzero((mapped[:-2] - mid) * (mapped[2:] - mid) > 0)
+        return offset + P[idx] - 1, offset + P[idx + 2] - 1
+
+    # Constraints based on Q2 and P1 → x variables, Q1 and P2 → y variables
+    x_plus, x_minus = local_extrema(P1, Q2, 0)
+    y_plus, y_minus = local_extrema(P2, Q1, n)
+    col_plus = np.concatenate((x_plus, y_plus))
+    col_minus = np.concatenate((x_minus, y_minus))
+    m = len(col_plus)
+
+    rows = np.repeat(np.arange(m, dtype=np.int32), 2)
+    cols = np.empty(2 * m, dtype=np.int32)
+    cols[0::2] = col_plus
+    cols[1::2] = col_minus
+    vals = np.tile(np.array([1, -1], dtype=np.int8), m)
+    return rows, cols, vals, np.full(m, -1, dtype=np.int8)
+
+def generate_combined_constraints(P1, P2, Q1, Q2, n):
+    # Rows for consecutive v, u in P1 (using Q2), then in P2 (using Q1).
+    # "own" is the column offset of the permutation's variables (x for P1,
+    # y for P2), "other" the remaining one.
+    k = n - 1
+    u = np.concatenate((P1[1:], P2[1:]))
+    v = np.concatenate((P1[:-1], P2[:-1]))
+    v_first = np.concatenate((Q2[P1[:-1] - 1] < Q2[P1[1:] - 1],
+                              Q1[P2[:-1] - 1] < Q1[P2[1:] - 1]))
+    own = np.repeat(np.array([0, n], dtype=np.int32), k)
+
+    # A pair adjacent in both permutations yields the same row from either
+    # block, whichever way round it appears, so skip its P2 copy. These are
+    # the only duplicate rows the three generators can produce.
+    keep = np.ones(2 * k, dtype=bool)
+    keep[k:] = np.abs(Q1[P2[:-1] - 1] - Q1[P2[1:] - 1]) != 1
+    u, v, v_first, own = u[keep], v[keep], v_first[keep], own[keep]
+    other = n - own
 
-        A_ub.append(row)
-        b_ub.append(-1)
+    # Every row has exactly four nonzeros: two x columns and two y columns
+    m = len(u)
+    rows = np.repeat(np.arange(m, dtype=np.int32), 4)
+    cols = np.empty(4 * m, dtype=np.int32)
+    vals = np.tile(np.array([-1, 1, -1, 1], dtype=np.int8), m)
+    cols[0::4] = own + u - 1                                # -x_u (-y_u)
+    cols[1::4] = own + v - 1                                # +x_v (+y_v)
+    cols[2::4] = other + np.where(v_first, u, v) - 1        # -y_u or -y_v
+    cols[3::4] = other + np.where(v_first, v, u) - 1        # +y_v or +y_u
 
-    return A_ub, b_ub
+    return rows, cols, vals, np.full(m, -1, dtype=np.int8)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("input_file", nargs="?")
     parser.add_argument("output_file", nargs="?")
     parser.add_argument("-d", dest="directory", default=".")
+    parser.add_argument("--sparse", action="store_true",
+                        help="Write A_ub as COO triplets (A_ub_coo) instead of a dense matrix")
+    parser.add_argument("--numba", action="store_true",
+                        help="Generate the constraints with the Numba kernels (requires numba)")
     args = parser.parse_args()
+    if args.numba and load_numba_kernels() is None:
+        print("numba is not installed; using the NumPy generators", file=sys.stderr)
 
     input_path = os.path.join(args.directory, args.input_file) if args.input_file else None
     output_path = os.path.join(args.directory, args.output_file) if args.output_file else None
@@ -181,9 +223,9 @@ def main():
     try:
         if input_path:
             with open(input_path) as f:
-                lines = f.readlines()
+                lines = read_input_lines(f)
         else:
-            lines = sys.stdin.readlines()
+            lines = read_input_lines(sys.stdin)
     except Exception as e:
         print(f"Error reading input: {e}", file=sys.stderr)
         sys.exit(1)
@@ -191,27 +233,36 @@ def main():
     P1, P2, obj_expr = parse_input(lines)
     n = len(P1)
     c = parse_objective(obj_expr, n)
-    A_ub, b_ub = build_full_constraints(P1, P2, n)
+    A_ub, b_ub = build_full_constraints(P1, P2, n, use_numba=args.numba)
     bounds = [[0, None] for _ in range(2 * n)]
     var_names = [f"x{i+1}" for i in range(n)] + [f"y{i+1}" for i in range(n)]
 
-    lp_json = {
-        "c": c,
-        "A_ub": A_ub,
-        "b_ub": b_ub,
+    lp_json = {"c": c.tolist()}
+    if args.sparse:
+        A_coo = A_ub.tocoo()
+        lp_json["A_ub_coo"] = {
+            "row": A_coo.row.tolist(),
+            "col": A_coo.col.tolist(),
+            "val": A_coo.data.tolist(),
+            "shape": list(A_coo.shape)
+        }
+    else:
+        lp_json["A_ub"] = A_ub.toarray().tolist()
+    lp_json.update({
+        "b_ub": b_ub.tolist(),
         "A_eq": [],
         "b_eq": [],
         "bounds": bounds,
         "variable_names": var_names
-    }
+    })
 
     try:
         if output_path:
             with open(output_path, 'w') as f:
-                json.dump(lp_json, f, indent=2)
+                f.write(to_json(lp_json))
                 f.write("\n")
         else:
-            print(json.dumps(lp_json, indent=2) + "\n")
+            print(to_json(lp_json) + "\n")
     except Exception as e:
         print(f"Error writing output: {e}", file=sys.stderr)
         sys.exit(1)
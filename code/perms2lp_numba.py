@@ -0,0 +1,100 @@
+import numpy as np
+from numba import njit
+
+# Numba kernels with the same signature and output as the generators in
+# perms2lp.py, written as plain loops over the permutations. perms2lp only
+# imports this module when run with --numba.
+
+@njit(cache=True)
+def monotonicity_nb(P1, P2, Q1, Q2, n):
+    nnz = 2 + 4 * (n - 1)
+    rows = np.empty(nnz, dtype=np.int32)
+    cols = np.empty(nnz, dtype=np.int32)
+    vals = np.empty(nnz, dtype=np.int8)
+    b_ub = np.zeros(2 * n, dtype=np.int8)
+
+    rows[0] = 0
+    cols[0] = P1[0] - 1
+    rows[1] = 1
+    cols[1] = n + P2[0] - 1
+    vals[0] = vals[1] = -1
+    b_ub[0] = b_ub[1] = -1
+
+    pos = 2
+    for i in range(n - 1):
+        rows[pos] = rows[pos + 1] = 2 + i
+        cols[pos] = P1[i] - 1
+        cols[pos + 1] = P1[i + 1] - 1
+        rows[pos + 2] = rows[pos + 3] = n + 1 + i
+        cols[pos + 2] = n + P2[i] - 1
+        cols[pos + 3] = n + P2[i + 1] - 1
+        vals[pos] = vals[pos + 2] = 1
+        vals[pos + 1] = vals[pos + 3] = -1
+        pos += 4
+    return rows, cols, vals, b_ub
+
+@njit(cache=True)
+def spacing_nb(P1, P2, Q1, Q2, n):
+    cap = 4 * max(n - 2, 0)
+    rows = np.empty(cap, dtype=np.int32)
+    cols = np.empty(cap, dtype=np.int32)
+    vals = np.empty(cap, dtype=np.int8)
+
+    m = 0
+    for block in range(2):
+        P = P1 if block == 0 else P2
+        Q = Q2 if block == 0 else Q1
+        offset = 0 if block == 0 else n
+        for i in range(1, n - 1):
+            a = np.int64(Q[P[i - 1] - 1])
+            b = np.int64(Q[P[i] - 1])
+            c = np.int64(Q[P[i + 1] - 1])
+            if (a - b) * (c - b) > 0:
+                rows[2 * m] = rows[2 * m + 1] = m
+                cols[2 * m] = offset + P[i - 1] - 1
+                cols[2 * m + 1] = offset + P[i + 1] - 1
+                vals[2 * m] = 1
+                vals[2 * m + 1] = -1
+                m += 1
+
+    b_ub = np.empty(m, dtype=np.int8)
+    b_ub[:] = -1
+    return rows[:2 * m], cols[:2 * m], vals[:2 * m], b_ub
+
+@njit(cache=True)
+def combined_nb(P1, P2, Q1, Q2, n):
+    cap = 2 * (n - 1)
+    rows = np.empty(4 * cap, dtype=np.int32)
+    cols = np.empty(4 * cap, dtype=np.int32)
+    vals = np.empty(4 * cap, dtype=np.int8)
+
+    r = 0
+    for block in range(2):
+        P = P1 if block == 0 else P2
+        Q = Q2 if block == 0 else Q1
+        # Columns of the permutation's own variables and of the other ones
+        own = 0 if block == 0 else n
+        other = n - own
+        for i in range(n - 1):
+            u = P[i + 1]
+            v = P[i]
+            # Skip the P2 copy of a pair adjacent in both permutations
+            if block == 1 and abs(Q1[v - 1] - Q1[u - 1]) == 1:
+                continue
+            pos = 4 * r
+            rows[pos:pos + 4] = r
+            cols[pos] = own + u - 1
+            cols[pos + 1] = own + v - 1
+            if Q[v - 1] < Q[u - 1]:
+                cols[pos + 2] = other + u - 1
+                cols[pos + 3] = other + v - 1
+            else:
+                cols[pos + 2] = other + v - 1
+                cols[pos + 3] = other + u - 1
+            vals[pos] = vals[pos + 2] = -1
+            vals[pos + 1] = vals[pos + 3] = 1
+            r += 1
+
+    b_ub = np.empty(r, dtype=np.int8)
+    b_ub[:] = -1
+    return rows[:4 * r], cols[:4 * r], vals[:4 * r], b_ub